@@ -1,6 +1,11 @@
 import os
+import re
+import json
+import zipfile
+import posixpath
+import contextlib
 import pypdf
-from docx import Document
+from lxml import etree
 from pdf2docx import Converter as Pdf2DocxConverter
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
@@ -9,6 +14,7 @@ import pytesseract
 from pdf2image import convert_from_path
 import threading
 import time
+from profiling import stage
 
 # --- Configure Tesseract Path for macOS ---
 # Check if tesseract is available in PATH, otherwise set the path manually
@@ -29,31 +35,71 @@ except Exception as e:
     pytesseract.pytesseract.tesseract_cmd = '/opt/homebrew/bin/tesseract'
 # -----------------------------------------------------------------------------
 
-def extract_text_from_pdf_pypdf(pdf_path):
-    """Attempts to extract text directly from a PDF using pypdf."""
+def extract_pages_from_pdf_pypdf(pdf_path):
+    """Attempts to extract text directly from a PDF using pypdf, one string per page."""
     try:
-        with open(pdf_path, 'rb') as pdf_file:
+        with stage('pypdf_extract'), open(pdf_path, 'rb') as pdf_file:
             pdf_reader = pypdf.PdfReader(pdf_file)
-            text = ""
+            pages = []
             for page_num in range(len(pdf_reader.pages)):
-                text += pdf_reader.pages[page_num].extract_text() or ""
-        return text
+                pages.append(pdf_reader.pages[page_num].extract_text() or "")
+        return pages
     except Exception as e:
         raise Exception(f"Ошибка при извлечении текста с помощью pypdf: {e}")
 
-def ocr_pdf_to_txt(pdf_path, output_folder, lang='rus+eng'):
-    """Performs OCR on a PDF file and saves the text to a TXT file."""
+def extract_text_from_pdf_pypdf(pdf_path):
+    """Attempts to extract text directly from a PDF using pypdf."""
+    return "".join(extract_pages_from_pdf_pypdf(pdf_path))
+
+def get_jsonl_output_path(source_path, output_folder):
+    """Returns the <name>.jsonl path that sits next to the TXT file of source_path."""
+    filename_without_ext = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(output_folder, f"{filename_without_ext}.jsonl")
+
+def write_jsonl_record(jsonl_file, record):
+    jsonl_file.write(json.dumps(record, ensure_ascii=False))
+    jsonl_file.write('\n')
+
+# --- JSONL record schema (one JSON object per line in <name>.jsonl) ---
+# All methods:
+#   source      - input file name
+#   page        - 1-based page number, None for text outside the page flow (DOCX headers, footers, notes)
+#   method      - 'ocr', 'direct', 'docx' or 'docx2txt'
+#   part        - 'body', or for DOCX also 'header', 'footnotes', 'endnotes', 'footer'
+#   text        - page text
+#   confidence  - average Tesseract confidence (OCR only), otherwise None
+# OCR only:
+#   dpi, width, height - rasterization DPI and page image size in pixels
+#   words       - with word_boxes: [{text, left, top, width, height, conf}] in image pixels
+# -----------------------------------------------------------------------------
+
+def write_jsonl_pages(source_path, output_folder, records):
+    """Saves per-page records next to the TXT file as <name>.jsonl (one JSON object per line)."""
+    os.makedirs(output_folder, exist_ok=True)
+    jsonl_output_path = get_jsonl_output_path(source_path, output_folder)
+    with stage('write_jsonl'), open(jsonl_output_path, 'w', encoding='utf-8') as jsonl_file:
+        for record in records:
+            write_jsonl_record(jsonl_file, record)
+    return jsonl_output_path
+
+# Rasterization DPI for OCR; word boxes in JSONL are pixels at this DPI
+OCR_DPI = 300
+
+def ocr_pdf_to_txt(pdf_path, output_folder, lang='rus+eng', jsonl=False, word_boxes=False):
+    """Performs OCR on a PDF file and saves the text to a TXT file (and optionally per-page JSONL)."""
     try:
         # First, test if tesseract is working
         try:
-            test_result = pytesseract.get_tesseract_version()
+            with stage('tesseract_check'):
+                test_result = pytesseract.get_tesseract_version()
             print(f"Tesseract версия: {test_result}")
         except Exception as e:
             raise Exception(f"Tesseract не работает: {e}")
         
         # Check if language is available
         try:
-            available_langs = pytesseract.get_languages()
+            with stage('tesseract_check'):
+                available_langs = pytesseract.get_languages()
             if 'rus' not in available_langs:
                 print("Предупреждение: русский язык не найден, используем английский")
                 lang = 'eng'
@@ -63,12 +109,14 @@ def ocr_pdf_to_txt(pdf_path, output_folder, lang='rus+eng'):
         
         # Convert PDF to images with higher DPI for better OCR
         try:
-            images = convert_from_path(pdf_path, dpi=300)
+            with stage('poppler_rasterize'):
+                images = convert_from_path(pdf_path, dpi=OCR_DPI)
             print(f"PDF конвертирован в {len(images)} изображений")
         except Exception as e:
             raise Exception(f"Ошибка при конвертации PDF в изображения: {e}")
         
         full_text = []
+        page_records = []
         for i, image in enumerate(images):
             print(f"Обрабатывается страница {i+1}/{len(images)}")
             
@@ -85,15 +133,18 @@ def ocr_pdf_to_txt(pdf_path, output_folder, lang='rus+eng'):
             
             best_text = ""
             best_confidence = 0
+            best_words = []
             
             for config in ocr_configs:
                 try:
-                    data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT, config=config)
+                    with stage('tesseract'):
+                        data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT, config=config)
                     
                     confidences = [conf for conf in data['conf'] if conf > 0]
                     avg_confidence = sum(confidences) / len(confidences) if confidences else 0
                     
                     lines = {}
+                    words = []
                     for j in range(len(data['text'])):
                         word = data['text'][j]
                         left = data['left'][j]
@@ -107,6 +158,15 @@ def ocr_pdf_to_txt(pdf_path, output_folder, lang='rus+eng'):
                                 lines[line_key] = []
                             
                             lines[line_key].append((left, word, conf))
+                            if word_boxes:
+                                words.append({
+                                    'text': word,
+                                    'left': left,
+                                    'top': top,
+                                    'width': data['width'][j],
+                                    'height': data['height'][j],
+                                    'conf': conf,
+                                })
                     
                     sorted_line_keys = sorted(lines.keys())
                     page_text = []
@@ -131,6 +191,7 @@ def ocr_pdf_to_txt(pdf_path, output_folder, lang='rus+eng'):
                     if avg_confidence > best_confidence or (avg_confidence == best_confidence and len(current_text) > len(best_text)):
                         best_text = current_text
                         best_confidence = avg_confidence
+                        best_words = words
                         
                 except Exception as e:
                     print(f"Ошибка с конфигурацией {config}: {e}")
@@ -142,6 +203,22 @@ def ocr_pdf_to_txt(pdf_path, output_folder, lang='rus+eng'):
             else:
                 print(f"Страница {i+1}: текст не найден")
                 full_text.append(f"[Страница {i+1}: текст не распознан]")
+
+            if jsonl:
+                record = {
+                    'source': os.path.basename(pdf_path),
+                    'page': i + 1,
+                    'method': 'ocr',
+                    'part': 'body',
+                    'text': best_text,
+                    'confidence': round(best_confidence, 2) if best_text else None,
+                    'dpi': OCR_DPI,
+                    'width': image.width,
+                    'height': image.height,
+                }
+                if word_boxes:
+                    record['words'] = best_words
+                page_records.append(record)
             
             if i < len(images) - 1:
                 full_text.append("\n--- Страница {} ---\n".format(i + 2))
@@ -152,30 +229,47 @@ def ocr_pdf_to_txt(pdf_path, output_folder, lang='rus+eng'):
         filename_without_ext = os.path.splitext(os.path.basename(pdf_path))[0]
         txt_output_path = os.path.join(output_folder, f"{filename_without_ext}.txt")
         
-        with open(txt_output_path, 'w', encoding='utf-8') as txt_file:
+        with stage('write_output'), open(txt_output_path, 'w', encoding='utf-8') as txt_file:
             txt_file.write(output_text)
+
+        if jsonl:
+            write_jsonl_pages(pdf_path, output_folder, page_records)
         
         return True, f"Успешно конвертировано (OCR): {os.path.basename(pdf_path)}"
     except Exception as e:
         raise Exception(f"Ошибка при конвертации с помощью OCR: {e}")
 
-def convert_pdf_to_txt_direct(pdf_path, output_folder):
-    """Converts a PDF file directly to a TXT file using pypdf."""
+def convert_pdf_to_txt_direct(pdf_path, output_folder, jsonl=False):
+    """Converts a PDF file directly to a TXT file (and optionally per-page JSONL) using pypdf."""
     try:
-        text = extract_text_from_pdf_pypdf(pdf_path)
+        pages = extract_pages_from_pdf_pypdf(pdf_path)
+        text = "".join(pages)
         
         os.makedirs(output_folder, exist_ok=True)
         filename_without_ext = os.path.splitext(os.path.basename(pdf_path))[0]
         txt_output_path = os.path.join(output_folder, f"{filename_without_ext}.txt")
         
-        with open(txt_output_path, 'w', encoding='utf-8') as txt_file:
+        with stage('write_output'), open(txt_output_path, 'w', encoding='utf-8') as txt_file:
             txt_file.write(text)
+
+        if jsonl:
+            write_jsonl_pages(pdf_path, output_folder, (
+                {
+                    'source': os.path.basename(pdf_path),
+                    'page': page_num,
+                    'method': 'direct',
+                    'part': 'body',
+                    'text': page_text,
+                    'confidence': None,
+                }
+                for page_num, page_text in enumerate(pages, 1)
+            ))
         return True, f"Успешно конвертировано (прямо): {os.path.basename(pdf_path)}"
     except Exception as e:
         raise Exception(f"Ошибка при прямой конвертации в TXT: {e}")
 
-def convert_pdf_to_docx_then_txt(pdf_path, output_folder):
-    """Converts a PDF file to DOCX and then extracts text from the DOCX to TXT."""
+def convert_pdf_to_docx_then_txt(pdf_path, output_folder, jsonl=False):
+    """Converts a PDF file to DOCX and then extracts text from the DOCX to TXT (and optionally per-page JSONL)."""
     try:
         os.makedirs(output_folder, exist_ok=True)
         
@@ -183,18 +277,20 @@ def convert_pdf_to_docx_then_txt(pdf_path, output_folder):
         docx_temp_path = os.path.join(output_folder, f"temp_{filename_without_ext}.docx")
         txt_output_path = os.path.join(output_folder, f"{filename_without_ext}.txt")
 
-        cv = Pdf2DocxConverter(pdf_path)
-        cv.convert(docx_temp_path)
-        cv.close()
+        with stage('pdf2docx_convert'):
+            cv = Pdf2DocxConverter(pdf_path)
+            cv.convert(docx_temp_path)
+            cv.close()
 
-        doc = Document(docx_temp_path)
-        full_text = []
-        for para in doc.paragraphs:
-            full_text.append(para.text)
-        text = '\n'.join(full_text)
-
-        with open(txt_output_path, 'w', encoding='utf-8') as txt_file:
-            txt_file.write(text)
+        # pdf2docx starts every PDF page with a new-page section and adds only
+        # continuous and new-column sections within a page, so the DOCX section
+        # breaks give the original PDF page numbers in JSONL
+        with stage('docx_extract'):
+            write_docx_text(
+                docx_temp_path, txt_output_path,
+                jsonl_output_path=get_jsonl_output_path(pdf_path, output_folder) if jsonl else None,
+                source_path=pdf_path, method='docx',
+            )
 
         os.remove(docx_temp_path)
         
@@ -202,21 +298,346 @@ def convert_pdf_to_docx_then_txt(pdf_path, output_folder):
     except Exception as e:
         raise Exception(f"Ошибка при конвертации через DOCX в TXT: {e}")
 
-def convert_docx_to_txt(docx_path, output_folder):
-    """Конвертирует DOCX файл в TXT с кодировкой utf-8."""
+# --- Streaming DOCX extraction ---
+# Reads the WordprocessingML parts straight from the zip with iterparse instead
+# of building the python-docx object tree, so tables, headers, footers and
+# notes are kept and memory stays bounded on very large documents.
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_NS = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+W_P = W_NS + 'p'
+W_T = W_NS + 't'
+W_TAB = W_NS + 'tab'
+W_TABS = W_NS + 'tabs'
+W_BR = W_NS + 'br'
+W_CR = W_NS + 'cr'
+W_TC = W_NS + 'tc'
+W_TR = W_NS + 'tr'
+W_TBL = W_NS + 'tbl'
+W_BODY = W_NS + 'body'
+W_FOOTNOTE = W_NS + 'footnote'
+W_ENDNOTE = W_NS + 'endnote'
+W_TYPE = W_NS + 'type'
+W_VAL = W_NS + 'val'
+W_SECTPR = W_NS + 'sectPr'
+W_PPR = W_NS + 'pPr'
+W_LAST_RENDERED_PAGE_BREAK = W_NS + 'lastRenderedPageBreak'
+MC_FALLBACK = MC_NS + 'Fallback'
+PR_RELATIONSHIP = '{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+DOCX_NOTE_SEPARATORS = ('separator', 'continuationSeparator', 'continuationNotice')
+DOCX_LINE_BREAKS = (None, 'textWrapping')
+# Section start types that begin on a new page (a missing w:type means nextPage)
+DOCX_PAGE_SECTION_STARTS = ('nextPage', 'evenPage', 'oddPage')
+
+
+def _docx_relationships(archive, names, part_name):
+    """Returns (type, target part name) for the internal relationships of a package part ('' = package root)."""
+    part_dir, part_file = posixpath.split(part_name)
+    rels_name = posixpath.join(part_dir, '_rels', part_file + '.rels')
+    if rels_name not in names:
+        return []
+    with archive.open(rels_name) as rels_file:
+        root = etree.parse(rels_file).getroot()
+    relationships = []
+    for rel in root.iter(PR_RELATIONSHIP):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = rel.get('Target', '')
+        if target.startswith('/'):
+            target_name = target.lstrip('/')
+        else:
+            target_name = posixpath.normpath(posixpath.join(part_dir, target))
+        # Relationship types differ between transitional and strict OOXML, the last segment does not
+        relationships.append((rel.get('Type', '').rsplit('/', 1)[-1], target_name))
+    return relationships
+
+
+def _docx_parts(archive):
+    """Returns [(part, name)] of a DOCX: headers, main document, footnotes, endnotes, footers."""
+    names = set(archive.namelist())
+    main_names = [name for rel_type, name in _docx_relationships(archive, names, '')
+                  if rel_type == 'officeDocument' and name in names]
+    if not main_names:
+        raise Exception("в архиве не найдена основная часть документа (officeDocument)")
+    main_name = main_names[0]
+
+    related = {}
+    for rel_type, name in _docx_relationships(archive, names, main_name):
+        if name in names:
+            related.setdefault(rel_type, []).append(name)
+
+    def natural_key(name):
+        return [int(chunk) if chunk.isdigit() else chunk for chunk in re.split(r'(\d+)', name)]
+
+    parts = [('header', name) for name in sorted(related.get('header', []), key=natural_key)]
+    parts.append(('body', main_name))
+    parts.extend(('footnotes', name) for name in related.get('footnotes', []))
+    parts.extend(('endnotes', name) for name in related.get('endnotes', []))
+    parts.extend(('footer', name) for name in sorted(related.get('footer', []), key=natural_key))
+    return parts
+
+
+def _docx_section_starts(xml_file):
+    """Returns, for every section of the main part in order, whether it starts on a new page."""
+    # A w:sectPr describes how its own section starts, but the break sits at the
+    # end of the previous section, so the main pass needs this list up front
+    starts = []
+    for _, elem in etree.iterparse(xml_file, events=('end',)):
+        if elem.tag == W_SECTPR:
+            start_type = elem.find(W_TYPE)
+            value = start_type.get(W_VAL) if start_type is not None else 'nextPage'
+            starts.append(value in DOCX_PAGE_SECTION_STARTS)
+        parent = elem.getparent()
+        if parent is not None and parent.tag == W_BODY:
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+    return starts
+
+
+def _iter_docx_part_blocks(xml_file, keep_empty=True, section_starts=None):
+    """Yields (text, page_breaks) per paragraph / table row of one WordprocessingML part, in document order."""
+    # One line per paragraph outside tables and per table row (cells separated
+    # by tabs). Inside cells tabs and line breaks become spaces and nested table
+    # rows are joined with " | ", so tabs only mark real column boundaries.
+    # page_breaks are offsets in the line where a new page starts.
+    #
+    # Open paragraphs ('p': runs, text box lines, breaks, section break),
+    # cells ('tc': paragraph texts) and rows ('tr': cell texts, breaks),
+    # innermost last.
+    stack = []
+    cell_depth = 0
+    fallback_depth = 0
+    section_index = 0
+    text_since_break = False
+    skip_note = False
+    ready = []
+
+    def add_line(text, breaks=()):
+        if stack:
+            frame = stack[-1]
+            if frame[0] == 'p':
+                if text.strip():
+                    frame[2].append(text)
+            else:
+                frame[1].append(text)
+        elif not skip_note and (keep_empty or text.strip()):
+            ready.append((text, list(breaks)))
+
+    def page_break():
+        # Breaks inside tables or text boxes go to the start of the enclosing
+        # row or to the current offset of the host paragraph
+        if stack:
+            top = stack[0]
+            if top[0] == 'p':
+                top[3].append(sum(len(run) for run in top[1]))
+            else:
+                top[2].append(0)
+
+    for event, elem in etree.iterparse(xml_file, events=('start', 'end')):
+        tag = elem.tag
+        # Word writes every text box twice; the mc:Fallback copy is skipped
+        if tag == MC_FALLBACK:
+            if event == 'start':
+                fallback_depth += 1
+            else:
+                fallback_depth -= 1
+                elem.clear()
+            continue
+        if fallback_depth:
+            continue
+
+        if event == 'start':
+            if tag == W_P:
+                stack.append(['p', [], [], [], False])
+            elif tag == W_TR:
+                stack.append(['tr', [], []])
+            elif tag == W_TC:
+                stack.append(['tc', []])
+                cell_depth += 1
+            elif tag in (W_FOOTNOTE, W_ENDNOTE):
+                skip_note = elem.get(W_TYPE) in DOCX_NOTE_SEPARATORS
+            continue
+
+        if tag == W_T:
+            if elem.text and stack and stack[-1][0] == 'p':
+                stack[-1][1].append(elem.text)
+                text_since_break = True
+        elif tag == W_TAB:
+            parent = elem.getparent()
+            if (parent is None or parent.tag != W_TABS) and stack and stack[-1][0] == 'p':
+                stack[-1][1].append(' ' if cell_depth else '\t')
+        elif tag in (W_BR, W_CR):
+            break_type = elem.get(W_TYPE)
+            if break_type in DOCX_LINE_BREAKS and stack and stack[-1][0] == 'p':
+                stack[-1][1].append(' ' if cell_depth else '\n')
+            elif break_type == 'page':
+                # Column breaks are ignored; page breaks only start a new page
+                page_break()
+                text_since_break = False
+        elif tag == W_LAST_RENDERED_PAGE_BREAK:
+            # Word repeats an explicit break as a rendered one: count it only
+            # if some text came after the previous break
+            if text_since_break:
+                page_break()
+                text_since_break = False
+        elif tag == W_SECTPR:
+            # A section break in a paragraph ends that section; it is a page
+            # break if the next section starts on a new page
+            parent = elem.getparent()
+            if section_starts is not None and parent is not None and parent.tag == W_PPR:
+                section_index += 1
+                if section_index < len(section_starts) and section_starts[section_index] and stack:
+                    stack[-1][4] = True
+            continue
+        elif tag == W_P:
+            _, runs, box_lines, breaks, section_break = stack.pop()
+            text = ''.join(runs)
+            if section_break and not stack:
+                breaks.append(len(text))
+                text_since_break = False
+            add_line(text, breaks)
+            # Text box paragraphs follow their host paragraph as own lines
+            for line in box_lines:
+                add_line(line)
+        elif tag == W_TC:
+            _, paragraphs = stack.pop()
+            cell_depth -= 1
+            if stack and stack[-1][0] == 'tr':
+                stack[-1][1].append(' '.join(p.strip() for p in paragraphs if p.strip()))
+        elif tag == W_TR:
+            _, cells, breaks = stack.pop()
+            add_line((' | ' if cell_depth else '\t').join(cells), breaks)
+        else:
+            continue
+
+        if tag in (W_P, W_TBL):
+            elem.clear()
+            parent = elem.getparent()
+            if parent is not None and parent.tag == W_BODY:
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+        if ready:
+            yield from ready
+            ready.clear()
+
+
+def iter_docx_blocks(docx_path, pages=False):
+    """Yields (part, text, page_breaks) for every line of a DOCX file: headers, body, notes, footers."""
+    with zipfile.ZipFile(docx_path) as archive:
+        parts = _docx_parts(archive)
+
+        # Section breaks need an extra pass over the main part, only done for pages=True
+        section_starts = None
+        if pages:
+            main_name = next(name for part, name in parts if part == 'body')
+            with archive.open(main_name) as xml_file:
+                section_starts = _docx_section_starts(xml_file)
+
+        for part, name in parts:
+            is_body = part == 'body'
+            with archive.open(name) as xml_file:
+                blocks = _iter_docx_part_blocks(
+                    xml_file, keep_empty=is_body, section_starts=section_starts if is_body else None
+                )
+                for text, breaks in blocks:
+                    yield part, text, breaks if is_body else []
+
+
+def iter_docx_lines(docx_path):
+    """Yields the text of a DOCX file line by line (see iter_docx_blocks for the order)."""
+    for _, text, _ in iter_docx_blocks(docx_path):
+        yield text
+
+
+def _split_at_page_breaks(text, breaks):
+    """Splits a line at page break offsets: returns the pieces, one per page touched."""
+    pieces = []
+    start = 0
+    for offset in breaks:
+        pieces.append(text[start:offset])
+        start = offset
+    pieces.append(text[start:])
+    return pieces
+
+
+def _write_docx_streams(docx_path, txt_file, jsonl_file, source_name, method):
+    """Writes the DOCX lines to txt_file and, if given, one JSONL record per page or non-body part to jsonl_file."""
+    record_part = None
+    record_lines = []
+    page_num = 1
+
+    def flush():
+        nonlocal page_num
+        write_jsonl_record(jsonl_file, {
+            'source': source_name,
+            'page': page_num if record_part == 'body' else None,
+            'method': method,
+            'part': record_part,
+            'text': '\n'.join(record_lines),
+            'confidence': None,
+        })
+        if record_part == 'body':
+            page_num += 1
+        record_lines.clear()
+
+    blocks = iter_docx_blocks(docx_path, pages=jsonl_file is not None)
+    for i, (part, text, breaks) in enumerate(blocks):
+        if i:
+            txt_file.write('\n')
+        txt_file.write(text)
+        if jsonl_file is None:
+            continue
+
+        if part != record_part:
+            if record_part is not None:
+                flush()
+            record_part = part
+        pieces = _split_at_page_breaks(text, breaks)
+        for k, piece in enumerate(pieces):
+            if k:
+                flush()
+            if piece or len(pieces) == 1:
+                record_lines.append(piece)
+
+    if jsonl_file is not None and record_part is not None:
+        flush()
+
+
+def write_docx_text(docx_path, txt_output_path, jsonl_output_path=None, source_path=None, method='docx2txt'):
+    """Streams the text of a DOCX file into a TXT file (and optionally per-page JSONL) with utf-8 encoding."""
+    # Written to temporary files and renamed at the end: a DOCX that fails
+    # halfway (e.g. a broken footnotes part) must not leave partial output
+    outputs = [(txt_output_path + '.tmp', txt_output_path)]
+    if jsonl_output_path:
+        outputs.append((jsonl_output_path + '.tmp', jsonl_output_path))
+    try:
+        with contextlib.ExitStack() as files:
+            txt_file = files.enter_context(open(outputs[0][0], 'w', encoding='utf-8'))
+            jsonl_file = None
+            if jsonl_output_path:
+                jsonl_file = files.enter_context(open(outputs[1][0], 'w', encoding='utf-8'))
+            _write_docx_streams(docx_path, txt_file, jsonl_file, os.path.basename(source_path or docx_path), method)
+    except BaseException:
+        for tmp_path, _ in outputs:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+    for tmp_path, output_path in outputs:
+        os.replace(tmp_path, output_path)
+
+
+def convert_docx_to_txt(docx_path, output_folder, jsonl=False):
+    """Конвертирует DOCX файл в TXT с кодировкой utf-8 (и при jsonl=True в JSONL по страницам)."""
     try:
-        from docx import Document
-        import os
         os.makedirs(output_folder, exist_ok=True)
         filename_without_ext = os.path.splitext(os.path.basename(docx_path))[0]
         txt_output_path = os.path.join(output_folder, f"{filename_without_ext}.txt")
-        doc = Document(docx_path)
-        full_text = []
-        for para in doc.paragraphs:
-            full_text.append(para.text)
-        text = '\n'.join(full_text)
-        with open(txt_output_path, 'w', encoding='utf-8') as txt_file:
-            txt_file.write(text)
+        with stage('docx_extract'):
+            write_docx_text(
+                docx_path, txt_output_path,
+                jsonl_output_path=get_jsonl_output_path(docx_path, output_folder) if jsonl else None,
+            )
         return True, f"Успешно конвертировано DOCX -> TXT: {os.path.basename(docx_path)}"
     except Exception as e:
         return False, f"Ошибка при конвертации DOCX -> TXT: {e}"
@@ -314,6 +735,8 @@ def start_conversion(conversion_method):
         messagebox.showinfo("Информация", "Папка для сохранения не выбрана.")
         return
 
+    save_jsonl = jsonl_var.get()
+
     # Create progress window
     progress = ConversionProgress(root)
     progress.show_progress_window(len(pdf_files))
@@ -328,11 +751,11 @@ def start_conversion(conversion_method):
                 
                 success, message = False, "Ошибка: неверный метод конвертации."
                 if conversion_method == 'ocr':
-                    success, message = ocr_pdf_to_txt(pdf_file_path, output_folder)
+                    success, message = ocr_pdf_to_txt(pdf_file_path, output_folder, jsonl=save_jsonl)
                 elif conversion_method == 'direct_txt':
-                    success, message = convert_pdf_to_txt_direct(pdf_file_path, output_folder)
+                    success, message = convert_pdf_to_txt_direct(pdf_file_path, output_folder, jsonl=save_jsonl)
                 elif conversion_method == 'docx_then_txt':
-                    success, message = convert_pdf_to_docx_then_txt(pdf_file_path, output_folder)
+                    success, message = convert_pdf_to_docx_then_txt(pdf_file_path, output_folder, jsonl=save_jsonl)
                 
                 if success:
                     successful_conversions.append(os.path.basename(pdf_file_path))
@@ -404,6 +827,8 @@ def start_docx_to_txt_conversion():
         messagebox.showinfo("Информация", "Папка для сохранения не выбрана.")
         return
 
+    save_jsonl = jsonl_var.get()
+
     progress = ConversionProgress(root)
     progress.show_progress_window(len(docx_files))
 
@@ -413,7 +838,7 @@ def start_docx_to_txt_conversion():
         for i, docx_file_path in enumerate(docx_files):
             try:
                 progress.update_progress(i, len(docx_files), docx_file_path)
-                success, message = convert_docx_to_txt(docx_file_path, output_folder)
+                success, message = convert_docx_to_txt(docx_file_path, output_folder, jsonl=save_jsonl)
                 if success:
                     successful_conversions.append(os.path.basename(docx_file_path))
                     progress.add_result(f"✅ {message}")
@@ -453,27 +878,33 @@ def start_docx_to_txt_conversion():
     conversion_thread.daemon = True
     conversion_thread.start()
 
-# GUI Setup
-root = tk.Tk()
-root.title("PDF в TXT конвертер (Улучшенный)")
-root.geometry("500x300")
+# GUI Setup (only when run as a script, so batch_converter.py can import the conversion functions)
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("PDF в TXT конвертер (Улучшенный)")
+    root.geometry("500x330")
+
+    # Instruction Label
+    instruction_label = tk.Label(root, text="1. Выберите PDF файлы.\n2. Выберите папку для сохранения.\n3. Выберите метод конвертации.\n\nФайлы с ошибками будут пропущены и добавлены в отчет.", justify=tk.LEFT)
+    instruction_label.pack(pady=10)
 
-# Instruction Label
-instruction_label = tk.Label(root, text="1. Выберите PDF файлы.\n2. Выберите папку для сохранения.\n3. Выберите метод конвертации.\n\nФайлы с ошибками будут пропущены и добавлены в отчет.", justify=tk.LEFT)
-instruction_label.pack(pady=10)
+    # Optional per-page JSONL output next to the TXT files
+    jsonl_var = tk.BooleanVar(value=False)
+    jsonl_checkbox = tk.Checkbutton(root, text="Также сохранять JSONL по страницам (.jsonl)", variable=jsonl_var)
+    jsonl_checkbox.pack(pady=5)
 
-# Buttons for conversion methods
-ocr_button = tk.Button(root, text="OCR сканирование (для сканированных PDF и таблиц)", command=lambda: start_conversion('ocr'))
-ocr_button.pack(pady=5, fill=tk.X, padx=20)
+    # Buttons for conversion methods
+    ocr_button = tk.Button(root, text="OCR сканирование (для сканированных PDF и таблиц)", command=lambda: start_conversion('ocr'))
+    ocr_button.pack(pady=5, fill=tk.X, padx=20)
 
-direct_txt_button = tk.Button(root, text="PDF -> TXT (прямая конвертация, для простых PDF)", command=lambda: start_conversion('direct_txt'))
-direct_txt_button.pack(pady=5, fill=tk.X, padx=20)
+    direct_txt_button = tk.Button(root, text="PDF -> TXT (прямая конвертация, для простых PDF)", command=lambda: start_conversion('direct_txt'))
+    direct_txt_button.pack(pady=5, fill=tk.X, padx=20)
 
-docx_txt_button = tk.Button(root, text="PDF -> DOCX -> TXT (для проблемных PDF)", command=lambda: start_conversion('docx_then_txt'))
-docx_txt_button.pack(pady=5, fill=tk.X, padx=20)
+    docx_txt_button = tk.Button(root, text="PDF -> DOCX -> TXT (для проблемных PDF)", command=lambda: start_conversion('docx_then_txt'))
+    docx_txt_button.pack(pady=5, fill=tk.X, padx=20)
 
-# Добавляю кнопку для DOCX -> TXT
-docx2txt_button = tk.Button(root, text="DOCX -> TXT (конвертация DOCX в TXT)", command=start_docx_to_txt_conversion)
-docx2txt_button.pack(pady=5, fill=tk.X, padx=20)
+    # Добавляю кнопку для DOCX -> TXT
+    docx2txt_button = tk.Button(root, text="DOCX -> TXT (конвертация DOCX в TXT)", command=start_docx_to_txt_conversion)
+    docx2txt_button.pack(pady=5, fill=tk.X, padx=20)
 
-root.mainloop()
\ No newline at end of file
+    root.mainloop()
\ No newline at end of file
@@ -18,8 +18,9 @@ from Script import (
     extract_text_from_pdf_pypdf,
     convert_docx_to_txt
 )
+from profiling import PROFILER, PROFILE_MODES, stage, document
 
-def batch_convert(input_folder, output_folder, method='auto', pattern='*.pdf'):
+def batch_convert(input_folder, output_folder, method='auto', pattern='*.pdf', jsonl=False, word_boxes=False, profile=None):
     """
     Batch convert PDF or DOCX files to TXT
     Args:
@@ -27,6 +28,9 @@ def batch_convert(input_folder, output_folder, method='auto', pattern='*.pdf'):
         output_folder: Folder to save TXT files
         method: Conversion method ('auto', 'direct', 'ocr', 'docx', 'docx2txt')
         pattern: File pattern to match (default: *.pdf or *.docx)
+        jsonl: Also save per-page JSONL (<name>.jsonl) next to each TXT file
+        word_boxes: Add OCR word bounding boxes and confidences to the JSONL records
+        profile: Profiling mode ('timers', 'cprofile', 'tracemalloc') or None to disable
     """
     
     # Find all files by pattern
@@ -41,18 +45,25 @@ def batch_convert(input_folder, output_folder, method='auto', pattern='*.pdf'):
     print(f"📂 Папка ввода: {input_folder}")
     print(f"📂 Папка вывода: {output_folder}")
     print(f"🔧 Метод конвертации: {method}")
+    if jsonl:
+        print(f"🧾 JSONL по страницам: да{' (с координатами слов)' if word_boxes else ''}")
     print("-" * 60)
     
     # Create output folder
     os.makedirs(output_folder, exist_ok=True)
+
+    if profile:
+        PROFILER.enable(profile, output_folder)
+        print(f"⏱️  Профилирование: {profile}")
     
     successful_conversions = []
     failed_conversions = []
     
-    for i, file_path in enumerate(files, 1):
+    def convert_one(i, file_path):
         filename = os.path.basename(file_path)
         print(f"[{i}/{len(files)}] Обрабатывается: {filename}")
         txt_path = os.path.join(output_folder, os.path.splitext(filename)[0] + '.txt')
+        jsonl_path = os.path.join(output_folder, os.path.splitext(filename)[0] + '.jsonl')
         try:
             ext = os.path.splitext(filename)[1].lower()
             if ext == '.pdf':
@@ -60,7 +71,8 @@ def batch_convert(input_folder, output_folder, method='auto', pattern='*.pdf'):
                 if method == 'auto':
                     # Try direct extraction first
                     try:
-                        text = extract_text_from_pdf_pypdf(file_path)
+                        with stage('auto_detect'):
+                            text = extract_text_from_pdf_pypdf(file_path)
                         if len(text.strip()) > 50:  # If we got substantial text
                             conversion_method = 'direct'
                         else:
@@ -71,16 +83,18 @@ def batch_convert(input_folder, output_folder, method='auto', pattern='*.pdf'):
                     conversion_method = method
                 
                 # Perform conversion
-                if conversion_method == 'direct':
-                    success, message = convert_pdf_to_txt_direct(file_path, output_folder)
-                elif conversion_method == 'ocr':
-                    success, message = ocr_pdf_to_txt(file_path, output_folder)
-                elif conversion_method == 'docx':
-                    success, message = convert_pdf_to_docx_then_txt(file_path, output_folder)
-                else:
-                    raise Exception(f"Неизвестный метод конвертации: {conversion_method}")
+                with stage(conversion_method):
+                    if conversion_method == 'direct':
+                        success, message = convert_pdf_to_txt_direct(file_path, output_folder, jsonl=jsonl)
+                    elif conversion_method == 'ocr':
+                        success, message = ocr_pdf_to_txt(file_path, output_folder, jsonl=jsonl, word_boxes=word_boxes)
+                    elif conversion_method == 'docx':
+                        success, message = convert_pdf_to_docx_then_txt(file_path, output_folder, jsonl=jsonl)
+                    else:
+                        raise Exception(f"Неизвестный метод конвертации: {conversion_method}")
             elif ext == '.docx':
-                success, message = convert_docx_to_txt(file_path, output_folder)
+                with stage('docx2txt'):
+                    success, message = convert_docx_to_txt(file_path, output_folder, jsonl=jsonl)
             else:
                 raise Exception(f"Неизвестный тип файла: {filename}")
             
@@ -90,7 +104,7 @@ def batch_convert(input_folder, output_folder, method='auto', pattern='*.pdf'):
             if not os.path.exists(txt_path) or os.path.getsize(txt_path) == 0:
                 is_empty = True
             else:
-                with open(txt_path, 'r', encoding='utf-8', errors='ignore') as f:
+                with stage('validation'), open(txt_path, 'r', encoding='utf-8', errors='ignore') as f:
                     content = f.read()
                     # Удаляем все невидимые символы (пробелы, табуляции, переносы строк, неразрывные пробелы, zero-width и т.д.)
                     content_no_invisible = re.sub(r'[\s\u00A0\u200B\u200C\u200D\uFEFF]', '', content)
@@ -118,11 +132,15 @@ def batch_convert(input_folder, output_folder, method='auto', pattern='*.pdf'):
                 print(f"   ❌ Ошибка: файл сконвертирован пустым!")
                 if os.path.exists(txt_path):
                     os.remove(txt_path)
+                if os.path.exists(jsonl_path):
+                    os.remove(jsonl_path)
             elif is_garbage:
                 failed_conversions.append(filename)
                 print(f"   ❌ Ошибка: файл содержит мусор (неотображаемые символы или набор спецсимволов)!")
                 if os.path.exists(txt_path):
                     os.remove(txt_path)
+                if os.path.exists(jsonl_path):
+                    os.remove(jsonl_path)
             elif success:
                 successful_conversions.append(filename)
                 print(f"   ✅ Успешно: {message}")
@@ -132,19 +150,32 @@ def batch_convert(input_folder, output_folder, method='auto', pattern='*.pdf'):
         except Exception as e:
             failed_conversions.append(filename)
             print(f"   ❌ Ошибка: {str(e)}")
-    
+
+    try:
+        for i, file_path in enumerate(files, 1):
+            with document(file_path):
+                convert_one(i, file_path)
+    finally:
+        # Written even if the run is interrupted; reset so that a later
+        # batch_convert call in the same process starts from a clean profile
+        if profile:
+            try:
+                PROFILER.write_report(output_folder)
+            finally:
+                PROFILER.reset()
+
     # Print summary
     print("\n" + "=" * 60)
     print("📊 РЕЗУЛЬТАТЫ КОНВЕРТАЦИИ")
     print("=" * 60)
     print(f"✅ Успешно конвертировано: {len(successful_conversions)}")
     print(f"❌ Ошибок: {len(failed_conversions)}")
-    
+
     if failed_conversions:
         print(f"\n📋 Файлы с ошибками:")
         for failed_file in failed_conversions:
             print(f"   • {failed_file}")
-        
+    
         # Save error report
         error_report_path = os.path.join(output_folder, "error_report.txt")
         with open(error_report_path, 'w', encoding='utf-8') as f:
@@ -180,9 +211,9 @@ def batch_convert(input_folder, output_folder, method='auto', pattern='*.pdf'):
                             if has_garbage_seq and not has_cyrillic:
                                 reason = ' (мусор)'
                 f.write(f"{failed_file}{reason}\n")
-        
-        print(f"\n📄 Отчет об ошибках сохранен в: {error_report_path}")
     
+        print(f"\n📄 Отчет об ошибках сохранен в: {error_report_path}")
+
     if successful_conversions:
         print(f"\n✅ Успешно конвертированные файлы:")
         for success_file in successful_conversions:
@@ -197,6 +228,9 @@ def main():
   python batch_converter.py /path/to/pdfs /path/to/output
   python batch_converter.py /path/to/pdfs /path/to/output --method ocr
   python batch_converter.py /path/to/pdfs /path/to/output --method direct --pattern "*.PDF"
+  python batch_converter.py /path/to/pdfs /path/to/output --method ocr --jsonl --word-boxes
+  python batch_converter.py /path/to/pdfs /path/to/output --profile
+  python batch_converter.py /path/to/pdfs /path/to/output --profile-mode cprofile
         """
     )
     
@@ -206,6 +240,14 @@ def main():
                        default='auto', help='Метод конвертации (по умолчанию: auto)')
     parser.add_argument('--pattern', default='*.pdf', 
                        help='Шаблон файлов (по умолчанию: *.pdf или *.docx)')
+    parser.add_argument('--jsonl', action='store_true',
+                       help='Дополнительно сохранять JSONL по страницам (текст, уверенность OCR)')
+    parser.add_argument('--word-boxes', action='store_true',
+                       help='Добавлять в JSONL координаты и уверенность слов (только OCR)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Профилирование этапов (таблица по этапам и flamegraph в папке вывода)')
+    parser.add_argument('--profile-mode', choices=PROFILE_MODES, default=None,
+                       help='Режим профилирования: timers (по умолчанию), cprofile или tracemalloc на каждый документ; включает --profile')
     
     args = parser.parse_args()
     
@@ -220,7 +262,9 @@ def main():
     
     # Start conversion
     try:
-        batch_convert(args.input_folder, args.output_folder, args.method, args.pattern)
+        batch_convert(args.input_folder, args.output_folder, args.method, args.pattern,
+                      jsonl=args.jsonl or args.word_boxes, word_boxes=args.word_boxes,
+                      profile=args.profile_mode or ('timers' if args.profile else None))
     except KeyboardInterrupt:
         print("\n⚠️  Конвертация прервана пользователем")
         sys.exit(1)
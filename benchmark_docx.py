@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark and regression checks for the streaming DOCX extractor.
+
+Compares iter_docx_lines (Script.py) with the old python-docx path
+(Document(path).paragraphs) on a generated large document:
+  - every python-docx paragraph line must also be in the streaming output;
+  - time and max RSS growth of both paths, each measured in a separate process.
+Also checks the streaming output of a small hand-written DOCX with the tricky
+cases (text boxes with mc:AlternateContent, page breaks, nested tables, a main
+part that is not word/document.xml) and the per-page JSONL records of a DOCX
+with section and page breaks.
+
+Usage:
+  python benchmark_docx.py
+  python benchmark_docx.py --paragraphs 100000 --workdir /tmp/docx_bench
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+import tempfile
+import time
+import json
+import zipfile
+from collections import Counter
+
+from docx import Document
+from docx.enum.section import WD_SECTION
+from docx.enum.text import WD_BREAK
+
+from Script import iter_docx_lines, write_docx_text
+
+W_NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:v="urn:schemas-microsoft-com:vml"'
+)
+
+REGRESSION_BODY = """
+<w:p>
+  <w:r><w:t xml:space="preserve">Before box </w:t></w:r>
+  <w:r>
+    <mc:AlternateContent>
+      <mc:Choice Requires="wps">
+        <w:drawing><w:txbxContent><w:p><w:r><w:t>BOXTEXT</w:t></w:r></w:p></w:txbxContent></w:drawing>
+      </mc:Choice>
+      <mc:Fallback>
+        <w:pict><v:textbox><w:txbxContent><w:p><w:r><w:t>BOXTEXT</w:t></w:r></w:p></w:txbxContent></v:textbox></w:pict>
+      </mc:Fallback>
+    </mc:AlternateContent>
+  </w:r>
+  <w:r><w:t>after box</w:t></w:r>
+</w:p>
+<w:p><w:r><w:t>line1</w:t><w:br w:type="page"/></w:r></w:p>
+<w:p><w:r><w:t>a</w:t><w:br/><w:t>b</w:t></w:r></w:p>
+<w:tbl>
+  <w:tr>
+    <w:tc><w:p><w:r><w:t>A</w:t></w:r></w:p></w:tc>
+    <w:tc>
+      <w:tbl>
+        <w:tr>
+          <w:tc><w:p><w:r><w:t>x</w:t></w:r></w:p></w:tc>
+          <w:tc><w:p><w:r><w:t>y</w:t></w:r></w:p></w:tc>
+        </w:tr>
+      </w:tbl>
+      <w:p/>
+    </w:tc>
+    <w:tc><w:p><w:r><w:t>c1</w:t><w:br/><w:t>c2</w:t><w:tab/><w:t>c3</w:t></w:r></w:p></w:tc>
+  </w:tr>
+</w:tbl>
+<w:p><w:r><w:t>end</w:t></w:r></w:p>
+"""
+
+REGRESSION_EXPECTED = [
+    'Before box after box',
+    'BOXTEXT',
+    'line1',
+    'a\nb',
+    'A\tx | y\tc1 c2 c3',
+    'end',
+]
+
+
+def write_raw_docx(path, body_xml, main_part='word/document.xml', extra_parts=None):
+    """Writes a minimal DOCX package whose main part body is body_xml; extra_parts are written unreferenced."""
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        f'<Override PartName="/{main_part}" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    )
+    rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        f'Target="{main_part}"/>'
+        '</Relationships>'
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document {W_NAMESPACES}><w:body>{body_xml}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', content_types)
+        archive.writestr('_rels/.rels', rels)
+        archive.writestr(main_part, document)
+        for name, data in (extra_parts or {}).items():
+            archive.writestr(name, data)
+
+
+def build_large_docx(path, paragraphs):
+    """Generates a DOCX with a header, a footer, text paragraphs and a table every 50 paragraphs."""
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Колонтитул: договор поставки"
+    doc.sections[0].footer.paragraphs[0].text = "Нижний колонтитул"
+    for i in range(paragraphs):
+        paragraph = doc.add_paragraph(f"Пункт {i}. Lorem ipsum dolor sit amet, consectetur adipiscing elit ")
+        paragraph.add_run("\tвторой фрагмент").bold = True
+        if i % 50 == 0:
+            table = doc.add_table(rows=3, cols=3)
+            for r in range(3):
+                for c in range(3):
+                    table.cell(r, c).text = f"ячейка {i}-{r}-{c}"
+    doc.save(path)
+
+
+def python_docx_lines(path):
+    return [para.text for para in Document(path).paragraphs]
+
+
+def missing_python_docx_lines(path):
+    """Returns python-docx paragraph lines that the streaming extractor does not produce."""
+    streamed = Counter(line for text in iter_docx_lines(path) for line in text.split('\n'))
+    expected = Counter(line for text in python_docx_lines(path) for line in text.split('\n'))
+    return expected - streamed
+
+
+def check_regressions(workdir):
+    path = os.path.join(workdir, 'regression.docx')
+    write_raw_docx(path, REGRESSION_BODY)
+    lines = list(iter_docx_lines(path))
+    if lines != REGRESSION_EXPECTED:
+        print("❌ Регрессионная проверка не пройдена")
+        print(f"   ожидалось: {REGRESSION_EXPECTED!r}")
+        print(f"   получено:  {lines!r}")
+        return False
+    missing = missing_python_docx_lines(path)
+    if missing:
+        print(f"❌ Регрессионный DOCX: потеряны строки python-docx: {list(missing)!r}")
+        return False
+
+    # Main part found through _rels/.rels, header parts without a relationship ignored
+    path = os.path.join(workdir, 'regression_document2.docx')
+    orphan_header = f'<w:hdr {W_NAMESPACES}><w:p><w:r><w:t>ORPHAN</w:t></w:r></w:p></w:hdr>'
+    write_raw_docx(path, REGRESSION_BODY, main_part='word/document2.xml',
+                   extra_parts={'word/header1.xml': orphan_header})
+    lines = list(iter_docx_lines(path))
+    if lines != REGRESSION_EXPECTED:
+        print("❌ DOCX с word/document2.xml прочитан неверно")
+        print(f"   получено:  {lines!r}")
+        return False
+    print("✅ Регрессионные проверки пройдены")
+    return True
+
+
+def build_pages_docx(path):
+    """Generates a DOCX with continuous, new-page and new-column sections, a page break and an empty page."""
+    doc = Document()
+    doc.add_paragraph("page 1")
+    doc.add_section(WD_SECTION.CONTINUOUS)
+    doc.add_paragraph("page 1, continuous section")
+    doc.add_section(WD_SECTION.NEW_PAGE)
+    paragraph = doc.add_paragraph("page 2")
+    paragraph.add_run().add_break(WD_BREAK.PAGE)
+    paragraph.add_run("page 3")
+    doc.add_section(WD_SECTION.NEW_COLUMN)
+    doc.add_paragraph("page 3, next column")
+    doc.add_section(WD_SECTION.NEW_PAGE)
+    doc.add_section(WD_SECTION.NEW_PAGE)
+    doc.add_paragraph("page 5")
+    doc.save(path)
+
+
+# Page number -> words that must be on that page only
+PAGES_EXPECTED = {
+    1: ["page 1", "page 1, continuous section"],
+    2: ["page 2"],
+    3: ["page 3", "page 3, next column"],
+    4: [],
+    5: ["page 5"],
+}
+
+
+def check_page_records(workdir):
+    path = os.path.join(workdir, 'pages.docx')
+    build_pages_docx(path)
+    txt_path = os.path.join(workdir, 'pages.txt')
+    jsonl_path = os.path.join(workdir, 'pages.jsonl')
+    write_docx_text(path, txt_path, jsonl_output_path=jsonl_path)
+    with open(jsonl_path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    pages = {r['page']: [line for line in r['text'].split('\n') if line] for r in records if r['part'] == 'body'}
+    if pages != PAGES_EXPECTED:
+        print("❌ Проверка разбиения JSONL по страницам не пройдена")
+        print(f"   ожидалось: {PAGES_EXPECTED!r}")
+        print(f"   получено:  {pages!r}")
+        return False
+    print("✅ Разбиение JSONL по страницам корректно")
+    return True
+
+
+def measure(path, which):
+    """Runs one extraction path in a separate process and returns (seconds, max RSS growth in MiB)."""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--measure', which, path],
+        capture_output=True, text=True, check=True,
+    )
+    # Script.py prints the Tesseract setup on import; the measurement is the last line
+    seconds, rss = result.stdout.strip().splitlines()[-1].split()
+    return float(seconds), float(rss)
+
+
+def _max_rss_mib():
+    # On Linux ru_maxrss survives exec and may still hold the parent's peak,
+    # so the per-process high-water mark is read from /proc instead
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status', encoding='ascii') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    import resource
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on other systems
+    return max_rss / 2 ** 20 if sys.platform == 'darwin' else max_rss / 1024
+
+
+def run_measure(which, path):
+    # Importing Script.py loads pdf2docx, PyMuPDF, OpenCV etc., so only the
+    # growth of max RSS during the extraction itself is reported
+    rss_before = _max_rss_mib()
+    start = time.perf_counter()
+    with open(os.devnull, 'w', encoding='utf-8') as sink:
+        if which == 'python-docx':
+            sink.write('\n'.join(python_docx_lines(path)))
+        else:
+            for line in iter_docx_lines(path):
+                sink.write(line + '\n')
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed:.3f} {_max_rss_mib() - rss_before:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк потокового извлечения текста из DOCX')
+    parser.add_argument('--paragraphs', type=int, default=40000,
+                       help='Количество абзацев в сгенерированном документе (по умолчанию: 40000)')
+    parser.add_argument('--workdir', default=None,
+                       help='Папка для сгенерированных файлов (по умолчанию: временная)')
+    parser.add_argument('--measure', nargs=2, metavar=('PATH_KIND', 'DOCX'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        run_measure(*args.measure)
+        return
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='docx_bench_')
+    os.makedirs(workdir, exist_ok=True)
+
+    ok = check_regressions(workdir)
+    ok = check_page_records(workdir) and ok
+
+    path = os.path.join(workdir, f'large_{args.paragraphs}.docx')
+    if not os.path.exists(path):
+        print(f"📝 Генерация {path} ...")
+        build_large_docx(path, args.paragraphs)
+
+    missing = missing_python_docx_lines(path)
+    if missing:
+        ok = False
+        print(f"❌ Потеряно строк python-docx: {sum(missing.values())}")
+    else:
+        print("✅ Все строки python-docx присутствуют в потоковом выводе")
+
+    print(f"\n{'Метод':<14} {'Время, s':>10} {'Прирост max RSS, MiB':>22}")
+    print("-" * 48)
+    for which in ('python-docx', 'iterparse'):
+        seconds, rss = measure(path, which)
+        print(f"{which:<14} {seconds:>10.3f} {rss:>22.1f}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
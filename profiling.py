@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lightweight profiling for conversion runs.
+
+Conversion code wraps its stages in `with stage('name'):`. While profiling is
+disabled (the default) stage() returns one shared no-op context manager, so the
+instrumentation costs a function call and an attribute check per stage.
+
+When enabled (batch_converter.py --profile / --profile-mode) every stage is
+timed, nested stages are recorded as call paths (e.g. "ocr;tesseract"), and at
+the end of the run write_report() saves:
+  profile_stages.txt - aggregate table per stage and per document
+  profile.folded     - flamegraph-compatible folded stacks (self time in µs),
+                       usable with flamegraph.pl or speedscope
+Optionally each document also runs under cProfile (profile/NNNN_<file>.prof) or
+tracemalloc (peak memory in the per-document table).
+"""
+
+import os
+import time
+import threading
+import contextlib
+import cProfile
+import tracemalloc
+
+PROFILE_MODES = ('timers', 'cprofile', 'tracemalloc')
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.mode = 'timers'
+        self.output_folder = None
+        self.stats = {}       # path -> [calls, total, min, max]
+        self.self_times = {}  # path -> self time in seconds
+        self.documents = []   # (filename, seconds, peak memory in bytes or None)
+        self.started_at = None
+        self._local = threading.local()
+
+    def enable(self, mode='timers', output_folder=None):
+        if mode not in PROFILE_MODES:
+            raise Exception(f"Неизвестный режим профилирования: {mode}")
+        self.reset()
+        self.enabled = True
+        self.mode = mode
+        self.output_folder = output_folder
+        self.started_at = time.perf_counter()
+
+    def reset(self):
+        """Disables profiling and drops everything collected so far."""
+        self.enabled = False
+        self.mode = 'timers'
+        self.output_folder = None
+        self.stats = {}
+        self.self_times = {}
+        self.documents = []
+        self.started_at = None
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, path, elapsed, self_time):
+        entry = self.stats.get(path)
+        if entry is None:
+            self.stats[path] = [1, elapsed, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = min(entry[2], elapsed)
+            entry[3] = max(entry[3], elapsed)
+        self.self_times[path] = self.self_times.get(path, 0.0) + self_time
+
+    def write_report(self, output_folder=None):
+        """Prints the aggregate stage table and saves it together with the folded stacks."""
+        output_folder = output_folder or self.output_folder
+        os.makedirs(output_folder, exist_ok=True)
+        run_time = time.perf_counter() - self.started_at if self.started_at else 0.0
+
+        lines = []
+        lines.append("Профиль конвертации")
+        lines.append("=" * 96)
+        lines.append(f"Дата: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        lines.append(f"Режим: {self.mode}")
+        lines.append(f"Общее время: {run_time:.3f} s")
+        lines.append("")
+        lines.append(f"{'Этап':<40} {'Вызовов':>8} {'Всего, s':>10} {'Собств., s':>11} {'Сред., ms':>10} {'Макс., ms':>10} {'%':>5}")
+        lines.append("-" * 96)
+        for path, (calls, total, _, longest) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+            share = (total / run_time * 100) if run_time else 0.0
+            lines.append(
+                f"{path:<40} {calls:>8} {total:>10.3f} {self.self_times[path]:>11.3f} "
+                f"{total / calls * 1000:>10.1f} {longest * 1000:>10.1f} {share:>5.1f}"
+            )
+
+        if self.documents:
+            lines.append("")
+            lines.append(f"{'Документ':<60} {'Время, s':>10} {'Пик памяти, MiB':>16}")
+            lines.append("-" * 88)
+            for filename, seconds, peak in self.documents:
+                peak_text = f"{peak / 2 ** 20:.1f}" if peak is not None else "-"
+                lines.append(f"{filename:<60} {seconds:>10.3f} {peak_text:>16}")
+
+        report = "\n".join(lines)
+        print("\n" + report)
+
+        report_path = os.path.join(output_folder, "profile_stages.txt")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+
+        folded_path = os.path.join(output_folder, "profile.folded")
+        with open(folded_path, 'w', encoding='utf-8') as f:
+            for path, self_time in sorted(self.self_times.items()):
+                micros = int(self_time * 1_000_000)
+                if micros > 0:
+                    f.write(f"{path} {micros}\n")
+
+        print(f"\n⏱️  Профиль сохранен в: {report_path}")
+        print(f"🔥 Flamegraph (folded stacks): {folded_path}")
+        return report_path, folded_path
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'path', 'start', 'frame')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.path = f"{stack[-1][0]};{self.name}" if stack else self.name
+        self.frame = [self.path, 0.0]
+        stack.append(self.frame)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1][1] += elapsed
+        self.profiler._record(self.path, elapsed, elapsed - self.frame[1])
+        return False
+
+
+class _Document:
+    def __init__(self, profiler, file_path):
+        self.profiler = profiler
+        self.file_path = file_path
+        self.cprofile = None
+
+    def __enter__(self):
+        if self.profiler.mode == 'tracemalloc':
+            tracemalloc.start()
+        elif self.profiler.mode == 'cprofile':
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        filename = os.path.basename(self.file_path)
+        peak = None
+        if self.profiler.mode == 'tracemalloc':
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        elif self.cprofile is not None:
+            self.cprofile.disable()
+            profile_dir = os.path.join(self.profiler.output_folder or '.', 'profile')
+            os.makedirs(profile_dir, exist_ok=True)
+            # Numbered, with the full file name: x.pdf and x.PDF must not share a dump
+            index = len(self.profiler.documents) + 1
+            self.cprofile.dump_stats(os.path.join(profile_dir, f"{index:04d}_{filename}.prof"))
+        self.profiler.documents.append((filename, elapsed, peak))
+        return False
+
+
+PROFILER = Profiler()
+
+
+def stage(name):
+    """Times a conversion stage; a shared no-op when profiling is disabled."""
+    if not PROFILER.enabled:
+        return _NULL_STAGE
+    return _Stage(PROFILER, name)
+
+
+def document(file_path):
+    """Wraps the conversion of one document (cProfile / tracemalloc per document)."""
+    if not PROFILER.enabled:
+        return _NULL_STAGE
+    return _Document(PROFILER, file_path)